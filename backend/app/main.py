@@ -1,175 +1,440 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
 import ast
-
-app = FastAPI()
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+# Worker processes that run analyze_source on cache misses; created when the
+# app starts
+process_pool = None
+
+def new_process_pool():
+    # Forking a server process that already runs threads (the threadpool
+    # behind sync endpoints) can deadlock the child, so workers are started
+    # from a forkserver where the platform has one, and spawned otherwise
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=context)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global process_pool
+    process_pool = new_process_pool()
+    try:
+        yield
+    finally:
+        process_pool.shutdown(cancel_futures=True)
+        process_pool = None
+
+# Responses are serialized with orjson, which is much faster than the stdlib
+# json module on large issue lists
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Largest snippet we will parse; bounds worst-case parse time and memory
+MAX_CODE_BYTES = 2_000_000
+# Largest request body accepted (a batch carries several snippets)
+MAX_REQUEST_BYTES = 16 * MAX_CODE_BYTES
+# Most snippets one /analyze_batch request may carry; bounds the pool jobs a
+# single request can queue and keeps a batch from evicting most of the
+# ANALYSIS_CACHE_SIZE results that /analyze relies on
+MAX_BATCH_SNIPPETS = 64
+
+def request_too_large_response():
+    return ORJSONResponse(
+        status_code=413,
+        content={"success": False, "message": "Request body too large"}
+    )
+
+class RequestTooLarge(HTTPException):
+    # An HTTPException so FastAPI's body reading re-raises it instead of
+    # turning it into a 400
+    def __init__(self):
+        super().__init__(status_code=413, detail="Request body too large")
+
+@app.exception_handler(RequestTooLarge)
+async def request_too_large_handler(request: Request, exc: RequestTooLarge):
+    return request_too_large_response()
+
+class LimitRequestSize:
+    # Pure ASGI middleware: rejects bodies over max_bytes up front when they
+    # declare a Content-Length, and otherwise (chunked uploads) counts bytes as
+    # they arrive and stops reading once past the limit
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.max_bytes
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > max_bytes:
+                await request_too_large_response()(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise RequestTooLarge()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(LimitRequestSize, max_bytes=MAX_REQUEST_BYTES)
 
 class AnalyzeRequest(BaseModel):
     code: str
 
+class AnalyzeBatchRequest(BaseModel):
+    codes: list[str] = Field(max_length=MAX_BATCH_SNIPPETS)
+
 @app.get("/")
 def read_root():
     return {"status": "AI Code Reviewer backend running"}
 
-def find_mutable_default_args(tree: ast.AST):
-    issues = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            # defaults correspond to the last N positional args
-            for default in node.args.defaults:
-                if isinstance(default, (ast.List, ast.Dict, ast.Set)):
-                    issues.append({
-                        "type": "mutable_default_argument",
-                        "severity": "high",
-                        "line": node.lineno,
-                        "col": node.col_offset,
-                        "message": f"Function '{node.name}' has a mutable default argument (list/dict/set).",
-                        "suggested_fix": "Use None as the default and create a new list/dict/set inside the function."
-                    })
-
-    return issues
-
-def find_exception_swallowing(tree: ast.AST):
-    issues = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Try):
-            for handler in node.handlers:
-                # handler.type is None for bare "except:"
-                is_bare_except = handler.type is None
-
-                # except Exception:
-                is_exception_except = (
-                    isinstance(handler.type, ast.Name) and handler.type.id == "Exception"
-                )
-
-                # If the except body is only "pass", it's swallowing
-                body_is_just_pass = (
-                    len(handler.body) == 1 and isinstance(handler.body[0], ast.Pass)
-                )
-
-                if body_is_just_pass and (is_bare_except or is_exception_except):
-                    issues.append({
-                        "type": "exception_swallowing",
-                        "severity": "high",
-                        "line": handler.lineno,
-                        "col": handler.col_offset,
-                        "message": "Exception is caught and ignored using 'except: pass' or 'except Exception: pass'.",
-                        "suggested_fix": "Handle the error, log it, or re-raise. Avoid silently ignoring exceptions."
-                    })
-
-    return issues
-
-def find_is_vs_equals_misuse(tree: ast.AST):
-    issues = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Compare):
-            # node.ops: list of comparison operators (Is, Eq, etc.)
-            # node.comparators: list of right-hand expressions
-            for op, comp in zip(node.ops, node.comparators):
-                if isinstance(op, (ast.Is, ast.IsNot)):
-                    # Allow "is None" and "is not None" (best practice)
-                    if isinstance(comp, ast.Constant) and comp.value is None:
-                        continue
-
-                    # Flag: using "is" with literals like strings/ints/bools
-                    if isinstance(comp, ast.Constant):
-                        issues.append({
-                            "type": "is_vs_equals_misuse",
-                            "severity": "medium",
-                            "line": node.lineno,
-                            "col": node.col_offset,
-                            "message": "Possible misuse of 'is'/'is not' for value comparison. Use '==' or '!=' for literals.",
-                            "suggested_fix": "Use '==' for equality checks (keep 'is None' only for None checks)."
-                        })
-
-    return issues
-
-def find_shadowed_builtins(tree: ast.AST):
-    issues = []
-
-    builtins_to_flag = {
-        "list", "dict", "set", "tuple", "str", "int", "float", "bool",
-        "id", "type", "sum", "min", "max", "len", "map", "filter", "input"
-    }
-
-    def add_issue(name: str, lineno: int, col: int):
-        issues.append({
-            "type": "shadowed_builtin",
-            "severity": "medium",
-            "line": lineno,
-            "col": col,
-            "message": f"Variable name '{name}' shadows a Python built-in.",
-            "suggested_fix": f"Rename '{name}' to something more specific (e.g., '{name}_value', '{name}_list')."
-        })
-
-    for node in ast.walk(tree):
-        # Assignments like: list = ...
-        if isinstance(node, ast.Assign):
-            for target in node.targets:
-                if isinstance(target, ast.Name) and target.id in builtins_to_flag:
-                    add_issue(target.id, node.lineno, node.col_offset)
-
-        # Function args like: def f(list): ...
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            for arg in node.args.args:
-                if arg.arg in builtins_to_flag:
-                    add_issue(arg.arg, arg.lineno, arg.col_offset)
-
-    return issues
-
-def find_possible_missing_returns(tree: ast.AST):
-    issues = []
-
-    def has_return_with_value(func: ast.AST) -> bool:
-        for n in ast.walk(func):
-            if isinstance(n, ast.Return) and n.value is not None:
-                return True
+# Node type sets, checked with type(node) in ... (a single hash lookup)
+# rather than isinstance against a tuple; none of these are subclassed
+FUNCTION_TYPES = frozenset({ast.FunctionDef, ast.AsyncFunctionDef})
+MUTABLE_LITERAL_TYPES = frozenset({ast.List, ast.Dict, ast.Set})
+IS_OPS = frozenset({ast.Is, ast.IsNot})
+
+@dataclass(slots=True)
+class Issue:
+    # One finding from a check. Slotted records are smaller and cheaper to
+    # build than dicts, and orjson serializes dataclasses natively.
+    type: str
+    severity: str
+    line: int
+    col: int
+    message: str
+    suggested_fix: str
+
+# Fixed text of each issue kind, shared by every finding of that kind
+MUTABLE_DEFAULT_FIX = "Use None as the default and create a new list/dict/set inside the function."
+EXCEPTION_SWALLOWING_MESSAGE = "Exception is caught and ignored using 'except: pass' or 'except Exception: pass'."
+EXCEPTION_SWALLOWING_FIX = "Handle the error, log it, or re-raise. Avoid silently ignoring exceptions."
+IS_VS_EQUALS_MESSAGE = "Possible misuse of 'is'/'is not' for value comparison. Use '==' or '!=' for literals."
+IS_VS_EQUALS_FIX = "Use '==' for equality checks (keep 'is None' only for None checks)."
+MISSING_RETURN_FIX = "Ensure all branches return a value (or return explicitly at the end)."
+
+def check_mutable_default_args(node):
+    # defaults correspond to the last N positional args; kw_defaults line up
+    # with the keyword-only args and hold None where there is no default
+    args = node.args
+    for default in (*args.defaults, *args.kw_defaults):
+        if type(default) in MUTABLE_LITERAL_TYPES:
+            yield Issue(
+                type="mutable_default_argument",
+                severity="high",
+                line=node.lineno,
+                col=node.col_offset,
+                message=f"Function '{node.name}' has a mutable default argument (list/dict/set).",
+                suggested_fix=MUTABLE_DEFAULT_FIX
+            )
+
+def check_exception_swallowing(node):
+    Name = ast.Name
+    Pass = ast.Pass
+
+    for handler in node.handlers:
+        handler_type = handler.type
+        handler_body = handler.body
+
+        # Swallowing: the body is only "pass" and the handler is a bare
+        # "except:" (type is None) or "except Exception:"
+        if len(handler_body) == 1 and type(handler_body[0]) is Pass and (
+            handler_type is None
+            or (type(handler_type) is Name and handler_type.id == "Exception")
+        ):
+            yield Issue(
+                type="exception_swallowing",
+                severity="high",
+                line=handler.lineno,
+                col=handler.col_offset,
+                message=EXCEPTION_SWALLOWING_MESSAGE,
+                suggested_fix=EXCEPTION_SWALLOWING_FIX
+            )
+
+def check_is_vs_equals_misuse(node):
+    # node.ops: list of comparison operators (Is, Eq, etc.)
+    # node.comparators: list of right-hand expressions
+    ops = node.ops
+    is_ops = IS_OPS
+
+    # Most comparisons are a single ==, <, in, ... with no 'is' at all
+    if len(ops) == 1:
+        if type(ops[0]) not in is_ops:
+            return
+    elif is_ops.isdisjoint(map(type, ops)):
+        return
+
+    # Past the fast path; bind what the loop needs and read the position
+    # once for every issue below
+    Constant = ast.Constant
+    line = node.lineno
+    col = node.col_offset
+
+    for op, comp in zip(ops, node.comparators):
+        # Only "is"/"is not" against a literal is flagged
+        if type(op) not in is_ops or type(comp) is not Constant:
+            continue
+
+        # Allow "is None" and "is not None" (best practice); flag literals
+        # like strings/ints/bools
+        if comp.value is not None:
+            yield Issue(
+                type="is_vs_equals_misuse",
+                severity="medium",
+                line=line,
+                col=col,
+                message=IS_VS_EQUALS_MESSAGE,
+                suggested_fix=IS_VS_EQUALS_FIX
+            )
+
+# Built once at import; frozenset since it is only ever used for membership tests
+BUILTINS_TO_FLAG = frozenset({
+    "list", "dict", "set", "tuple", "str", "int", "float", "bool",
+    "id", "type", "sum", "min", "max", "len", "map", "filter", "input"
+})
+
+def shadowed_builtin_issue(name: str, lineno: int, col: int):
+    return Issue(
+        type="shadowed_builtin",
+        severity="medium",
+        line=lineno,
+        col=col,
+        message=f"Variable name '{name}' shadows a Python built-in.",
+        suggested_fix=f"Rename '{name}' to something more specific (e.g., '{name}_value', '{name}_list')."
+    )
+
+def check_shadowed_builtin_assign(node):
+    # Assignments like: list = ...
+    Name = ast.Name
+    for target in node.targets:
+        if type(target) is Name and target.id in BUILTINS_TO_FLAG:
+            yield shadowed_builtin_issue(target.id, node.lineno, node.col_offset)
+
+def check_shadowed_builtin_args(node):
+    # Function args like: def f(list): ...
+    for arg in node.args.args:
+        name = arg.arg
+        if name in BUILTINS_TO_FLAG:
+            yield shadowed_builtin_issue(name, arg.lineno, arg.col_offset)
+
+def ends_with_guaranteed_return(body) -> bool:
+    if not body:
         return False
+    last = body[-1]
+    last_type = type(last)
 
-    def ends_with_guaranteed_return(body) -> bool:
-        if not body:
-            return False
-        last = body[-1]
+    # return ...
+    if last_type is ast.Return:
+        return True
 
-        # return ...
-        if isinstance(last, ast.Return):
-            return True
-
-        # if/else where both sides guarantee return
-        if isinstance(last, ast.If):
-            return ends_with_guaranteed_return(last.body) and ends_with_guaranteed_return(last.orelse)
-
-        # try where all relevant blocks guarantee return
-        if isinstance(last, ast.Try):
-            # If try has excepts, all except bodies must guarantee return too
-            handlers_ok = all(ends_with_guaranteed_return(h.body) for h in last.handlers) if last.handlers else True
-            orelse_ok = ends_with_guaranteed_return(last.orelse) if last.orelse else True
-            final_ok = ends_with_guaranteed_return(last.finalbody) if last.finalbody else True
-            return ends_with_guaranteed_return(last.body) and handlers_ok and orelse_ok and final_ok
+    # if/else where both sides guarantee return; an if without an else
+    # can always fall through, so don't bother recursing into it
+    if last_type is ast.If:
+        if not last.orelse:
+            return False
+        return ends_with_guaranteed_return(last.body) and ends_with_guaranteed_return(last.orelse)
+
+    # try where all relevant blocks guarantee return; stops at the first
+    # block that doesn't. If try has excepts, all except bodies must
+    # guarantee return too; else/finally only count when present.
+    if last_type is ast.Try:
+        return (
+            ends_with_guaranteed_return(last.body)
+            and all(ends_with_guaranteed_return(h.body) for h in last.handlers)
+            and (not last.orelse or ends_with_guaranteed_return(last.orelse))
+            and (not last.finalbody or ends_with_guaranteed_return(last.finalbody))
+        )
+
+    return False
+
+def check_possible_missing_return(node, has_return_with_value: bool):
+    # has_return_with_value is collected by analyze_tree while it walks the function
+    if has_return_with_value and not ends_with_guaranteed_return(node.body):
+        yield Issue(
+            type="possible_missing_return",
+            severity="medium",
+            line=node.lineno,
+            col=node.col_offset,
+            message=f"Function '{node.name}' may not return a value on all code paths.",
+            suggested_fix=MISSING_RETURN_FIX
+        )
+
+# Checks that run on function definitions
+FUNCTION_CHECKS = [
+    check_mutable_default_args,
+    check_shadowed_builtin_args,
+]
+
+# Node class -> checks to run on it. Looked up with type(node), which is
+# cheaper than ast.NodeVisitor's per-node getattr(self, "visit_" + name) and
+# as fast as a generated if/elif chain over these types.
+HANDLERS = {
+    ast.FunctionDef: FUNCTION_CHECKS,
+    ast.AsyncFunctionDef: FUNCTION_CHECKS,
+    ast.Try: [check_exception_swallowing],
+    ast.Compare: [check_is_vs_equals_misuse],
+    ast.Assign: [check_shadowed_builtin_assign],
+}
+
+# Node types with nothing underneath them that a check cares about; the
+# walker never pushes these, which skips most of the expression leaves.
+LEAF_TYPES = frozenset({
+    ast.Load, ast.Store, ast.Del, ast.Name, ast.Constant,
+    ast.Pass, ast.Break, ast.Continue, ast.alias,
+    *ast.boolop.__subclasses__(),
+    *ast.operator.__subclasses__(),
+    *ast.unaryop.__subclasses__(),
+    *ast.cmpop.__subclasses__(),
+})
+
+def function_children(node):
+    # Children of a function definition worth walking: its decorators, type
+    # parameters (3.12+), the expressions in its signature and its body. The
+    # arguments/arg wrapper nodes are skipped, the signature checks read them
+    # straight off the function node.
+    args = node.args
+    children = list(node.decorator_list)
+    children.extend(getattr(node, "type_params", ()))
+    for arg in (*args.posonlyargs, *args.args, args.vararg, *args.kwonlyargs, args.kwarg):
+        if arg is not None and arg.annotation is not None:
+            children.append(arg.annotation)
+    children.extend(args.defaults)
+    children.extend(default for default in args.kw_defaults if default is not None)
+    if node.returns is not None:
+        children.append(node.returns)
+    children.extend(node.body)
+    return children
+
+def analyze_tree(tree: ast.AST):
+    # Generator: issues are yielded as the walk finds them, and the caller
+    # collects them once with list(...)
+    # Globals and ast classes used per node are bound to locals once so the
+    # loop below reads them with LOAD_FAST (ast classes keep their PascalCase
+    # names, as in the checks)
+    handlers_get = HANDLERS.get
+    leaf_types = LEAF_TYPES
+    function_types = FUNCTION_TYPES
+    get_function_children = function_children
+    missing_return_check = check_possible_missing_return
+    AST = ast.AST
+    Return = ast.Return
+
+    # Functions whose bodies are still being walked, as [node, has_return_with_value]
+    open_functions = []
+
+    # Iterative pre-order walk with an explicit stack; every check hangs off
+    # the node type it cares about, so each node costs one dict lookup.
+    # A None on the stack marks the end of the innermost open function.
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            # Only the function's own returns count; a nested function's
+            # returns were credited to that nested function
+            func, has_value = open_functions.pop()
+            yield from missing_return_check(func, has_value)
+            continue
+
+        node_type = type(node)
+        checks = handlers_get(node_type)
+        if checks is not None:
+            for check in checks:
+                yield from check(node)
+
+        if node_type in function_types:
+            open_functions.append([node, False])
+            stack.append(None)
+            children = [child for child in get_function_children(node) if type(child) not in leaf_types]
+        else:
+            if node_type is Return and node.value is not None and open_functions:
+                open_functions[-1][1] = True
+
+            # Inlined ast.iter_child_nodes: read each field once and push the
+            # child nodes, skipping leaves
+            children = []
+            for field in node._fields:
+                value = getattr(node, field, None)
+                if type(value) is list:
+                    for child in value:
+                        if isinstance(child, AST) and type(child) not in leaf_types:
+                            children.append(child)
+                elif isinstance(value, AST) and type(value) not in leaf_types:
+                    children.append(value)
+
+        # Reversed so siblings are popped (and reported) in source order
+        children.reverse()
+        stack.extend(children)
+
+def code_too_large_result(size: int):
+    return {
+        "success": False,
+        "message": "Code too large",
+        "issues": [
+            {
+                "type": "code_too_large",
+                "severity": "high",
+                "line": None,
+                "col": None,
+                "details": f"Submitted code is {size} bytes; the limit is {MAX_CODE_BYTES} bytes."
+            }
+        ]
+    }
 
-        return False
+def encoding_error_result(error: UnicodeEncodeError):
+    # Code that can't be encoded as UTF-8, e.g. a lone surrogate ("\ud800"),
+    # which JSON allows in a string
+    code = error.object
+    line_start = code.rfind("\n", 0, error.start) + 1
+    return {
+        "success": False,
+        "message": "Encoding error",
+        "issues": [
+            {
+                "type": "encoding_error",
+                "severity": "high",
+                "line": code.count("\n", 0, error.start) + 1,
+                "col": error.start - line_start,
+                "details": f"Code is not valid UTF-8: {error.reason}"
+            }
+        ]
+    }
 
-    for node in ast.walk(tree):
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            if has_return_with_value(node) and not ends_with_guaranteed_return(node.body):
-                issues.append({
-                    "type": "possible_missing_return",
-                    "severity": "medium",
-                    "line": node.lineno,
-                    "col": node.col_offset,
-                    "message": f"Function '{node.name}' may not return a value on all code paths.",
-                    "suggested_fix": "Ensure all branches return a value (or return explicitly at the end)."
-                })
+# Order of the rule groups in a response's issues list
+RULE_ORDER = {
+    "mutable_default_argument": 0,
+    "exception_swallowing": 1,
+    "is_vs_equals_misuse": 2,
+    "shadowed_builtin": 3,
+    "possible_missing_return": 4,
+}
 
-    return issues
+def issue_rule_order(issue: Issue) -> int:
+    return RULE_ORDER[issue.type]
 
-@app.post("/analyze")
-def analyze_code(request: AnalyzeRequest):
+def analyze_source(code: str):
     try:
-        tree = ast.parse(request.code)
+        tree = ast.parse(code)
     except SyntaxError as e:
         return {
             "success": False,
@@ -185,15 +450,136 @@ def analyze_code(request: AnalyzeRequest):
             ]
         }
 
-    issues = []
-    issues.extend(find_mutable_default_args(tree))
-    issues.extend(find_exception_swallowing(tree))
-    issues.extend(find_is_vs_equals_misuse(tree))
-    issues.extend(find_shadowed_builtins(tree))
-    issues.extend(find_possible_missing_returns(tree))
+    # The walk finds issues in source order; the response lists them grouped
+    # by rule (sorted() is stable, so source order holds within a rule)
+    issues = sorted(analyze_tree(tree), key=issue_rule_order)
 
     return {
         "success": True,
         "message": "Analysis complete",
         "issues": issues
-    }
\ No newline at end of file
+    }
+
+# Results of recent analyses keyed by the SHA-256 of the submitted code, so the
+# same snippet sent again (editor auto-analyze, CI retries) skips parsing.
+# Oldest entries are evicted first once the cache is full.
+ANALYSIS_CACHE_SIZE = 512
+# Only touched from the event loop (both analyze endpoints are async), so no
+# lock is needed
+analysis_cache = OrderedDict()
+
+def hash_code(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def get_cached_analysis(code_hash: str):
+    result = analysis_cache.get(code_hash)
+    if result is not None:
+        analysis_cache.move_to_end(code_hash)
+    return result
+
+def store_analysis(code_hash: str, result):
+    analysis_cache[code_hash] = result
+    if len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+        analysis_cache.popitem(last=False)
+
+# Snippets smaller than this are analyzed in the server process: they take
+# about 100 µs there, against roughly 290 µs for the round trip to a worker
+POOL_MIN_BYTES = 4096
+
+def replace_broken_pool(broken):
+    global process_pool
+    # Concurrent requests can all see the same broken pool; only the first
+    # one to get here replaces it
+    if process_pool is broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+        process_pool = new_process_pool()
+
+async def run_analysis(code: str, size: int):
+    if size < POOL_MIN_BYTES:
+        return analyze_source(code)
+
+    # Parsed and analyzed in a worker process so large snippets don't hold
+    # this process's GIL. A worker that dies (OOM kill, crash) breaks the
+    # whole pool, so swap in a fresh one and retry once; a snippet that
+    # breaks it again fails this request but leaves a working pool behind.
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = process_pool
+        try:
+            return await loop.run_in_executor(pool, analyze_source, code)
+        except BrokenProcessPool:
+            replace_broken_pool(pool)
+            if attempt:
+                raise
+
+def copy_result(result):
+    # Cached results are shared between requests, so hand out a fresh
+    # top-level dict and issues list each time
+    return {**result, "issues": list(result["issues"])}
+
+@app.post("/analyze")
+async def analyze_code(request: AnalyzeRequest):
+    # Both analyze endpoints return ORJSONResponse directly so the Issue
+    # records go straight to orjson instead of through jsonable_encoder first
+    code = request.code
+    try:
+        data = code.encode()
+    except UnicodeEncodeError as e:
+        return ORJSONResponse(encoding_error_result(e))
+    if len(data) > MAX_CODE_BYTES:
+        return ORJSONResponse(code_too_large_result(len(data)))
+
+    # Cache hits are answered right here on the event loop
+    code_hash = hash_code(data)
+    result = get_cached_analysis(code_hash)
+    if result is None:
+        result = await run_analysis(code, len(data))
+        store_analysis(code_hash, result)
+
+    return ORJSONResponse(copy_result(result))
+
+@app.post("/analyze_batch")
+async def analyze_batch(request: AnalyzeBatchRequest):
+    # Snippet hash -> positions in the batch, so duplicates are analyzed once
+    positions = {}
+    sizes = {}
+    results = [None] * len(request.codes)
+    for index, code in enumerate(request.codes):
+        # A snippet that can't be encoded fails on its own, not the whole batch
+        try:
+            data = code.encode()
+        except UnicodeEncodeError as e:
+            results[index] = encoding_error_result(e)
+            continue
+        if len(data) > MAX_CODE_BYTES:
+            results[index] = code_too_large_result(len(data))
+        else:
+            code_hash = hash_code(data)
+            positions.setdefault(code_hash, []).append(index)
+            sizes[code_hash] = len(data)
+
+    misses = []
+    for code_hash, indexes in positions.items():
+        result = get_cached_analysis(code_hash)
+        if result is None:
+            misses.append(code_hash)
+        for index in indexes:
+            results[index] = result
+
+    # Snippets are independent, so large cache misses are spread over the
+    # worker processes instead of running one after another under the GIL
+    if misses:
+        fresh = await asyncio.gather(*(
+            run_analysis(request.codes[positions[code_hash][0]], sizes[code_hash])
+            for code_hash in misses
+        ))
+        for code_hash, result in zip(misses, fresh):
+            store_analysis(code_hash, result)
+            for index in positions[code_hash]:
+                results[index] = result
+
+    return ORJSONResponse({
+        "success": True,
+        "message": "Analysis complete",
+        "results": [copy_result(result) for result in results]
+    })
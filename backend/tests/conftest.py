@@ -0,0 +1,12 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import analysis_cache, app
+
+@pytest.fixture
+def client():
+    # Start each test with an empty result cache
+    analysis_cache.clear()
+    # Entering the client runs the app lifespan, which starts the process pool
+    with TestClient(app) as client:
+        yield client
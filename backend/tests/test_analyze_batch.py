@@ -0,0 +1,63 @@
+import app.main
+from app.main import MAX_BATCH_SNIPPETS
+
+def count_analyses(monkeypatch):
+    # Small snippets are analyzed in-process, so wrapping analyze_source
+    # sees every cache miss
+    analyzed = []
+    analyze_source = app.main.analyze_source
+
+    def counting_analyze_source(code):
+        analyzed.append(code)
+        return analyze_source(code)
+
+    monkeypatch.setattr(app.main, "analyze_source", counting_analyze_source)
+    return analyzed
+
+def issue_types(result):
+    return [issue["type"] for issue in result["issues"]]
+
+def test_results_follow_request_order(client):
+    codes = ["x is 1", "def f(a=[]):\n    pass\n", "def (", "y = 2"]
+    response = client.post("/analyze_batch", json={"codes": codes})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [issue_types(result) for result in results] == [
+        ["is_vs_equals_misuse"],
+        ["mutable_default_argument"],
+        ["syntax_error"],
+        [],
+    ]
+
+def test_duplicate_snippets_are_analyzed_once(client, monkeypatch):
+    analyzed = count_analyses(monkeypatch)
+    response = client.post("/analyze_batch", json={"codes": ["x is 1", "y = 2", "x is 1"]})
+    results = response.json()["results"]
+    assert sorted(analyzed) == ["x is 1", "y = 2"]
+    assert results[0] == results[2]
+
+def test_cache_hits_mixed_with_misses(client, monkeypatch):
+    client.post("/analyze", json={"code": "x is 1"})
+    analyzed = count_analyses(monkeypatch)
+    response = client.post("/analyze_batch", json={"codes": ["y = 2", "x is 1"]})
+    results = response.json()["results"]
+    assert analyzed == ["y = 2"]
+    assert [issue_types(result) for result in results] == [[], ["is_vs_equals_misuse"]]
+
+def test_unencodable_snippet_fails_alone(client):
+    response = client.post(
+        "/analyze_batch",
+        content='{"codes": ["x is 1", "a = 1\\nb = \\"\\ud800\\""]}',
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 200
+    first, second = response.json()["results"]
+    assert issue_types(first) == ["is_vs_equals_misuse"]
+    assert second["success"] is False
+    assert second["issues"][0]["type"] == "encoding_error"
+    assert (second["issues"][0]["line"], second["issues"][0]["col"]) == (2, 5)
+
+def test_too_many_snippets_is_rejected(client):
+    codes = [f"x = {i}" for i in range(MAX_BATCH_SNIPPETS + 1)]
+    response = client.post("/analyze_batch", json={"codes": codes})
+    assert response.status_code == 422
@@ -0,0 +1,24 @@
+from app.main import analyze_source
+
+def test_issues_are_grouped_by_rule():
+    code = (
+        "def f(x, list=[]):\n"
+        "    if x is 1:\n"
+        "        return 1\n"
+        "try:\n"
+        "    pass\n"
+        "except:\n"
+        "    pass\n"
+        "def g(a={}):\n"
+        "    dict = a\n"
+    )
+    result = analyze_source(code)
+    assert [(issue.type, issue.line) for issue in result["issues"]] == [
+        ("mutable_default_argument", 1),
+        ("mutable_default_argument", 8),
+        ("exception_swallowing", 6),
+        ("is_vs_equals_misuse", 2),
+        ("shadowed_builtin", 1),
+        ("shadowed_builtin", 9),
+        ("possible_missing_return", 1),
+    ]
@@ -0,0 +1,28 @@
+from app.main import analyze_source
+
+def missing_return_functions(code: str):
+    result = analyze_source(code)
+    return [
+        issue.message.split("'")[1]
+        for issue in result["issues"]
+        if issue.type == "possible_missing_return"
+    ]
+
+def test_helper_returning_value_does_not_flag_outer_function():
+    code = (
+        "def decorator(func):\n"
+        "    def wrapper(*args):\n"
+        "        return func(*args)\n"
+        "    wrapper.__name__ = func.__name__\n"
+    )
+    assert missing_return_functions(code) == []
+
+def test_outer_function_with_own_partial_return_is_flagged():
+    code = (
+        "def outer(x):\n"
+        "    def helper():\n"
+        "        return 1\n"
+        "    if x:\n"
+        "        return helper()\n"
+    )
+    assert missing_return_functions(code) == ["outer"]
@@ -0,0 +1,30 @@
+import sys
+
+import pytest
+
+from app.main import analyze_source
+
+def mutable_default_issues(code: str):
+    result = analyze_source(code)
+    return [issue for issue in result["issues"] if issue.type == "mutable_default_argument"]
+
+def test_keyword_only_mutable_default_is_flagged():
+    issues = mutable_default_issues("def f(*, b={}):\n    pass\n")
+    assert [issue.message for issue in issues] == [
+        "Function 'f' has a mutable default argument (list/dict/set)."
+    ]
+
+def test_keyword_only_arg_without_default_is_skipped():
+    # kw_defaults holds None for 'a', which has no default
+    issues = mutable_default_issues("def f(x=[], *, a, b=set(), c=[1]):\n    pass\n")
+    assert len(issues) == 2
+
+def test_comparisons_in_signature_are_still_checked():
+    code = "@dec(x is 1)\ndef f(a: (y is 'a') = z is 2) -> (w is 3):\n    pass\n"
+    result = analyze_source(code)
+    assert [issue.type for issue in result["issues"]].count("is_vs_equals_misuse") == 4
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="type parameters need Python 3.12")
+def test_comparisons_in_type_parameters_are_still_checked():
+    result = analyze_source("def f[T: (x is 1)]():\n    pass\n")
+    assert [issue.type for issue in result["issues"]] == ["is_vs_equals_misuse"]
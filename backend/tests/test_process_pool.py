@@ -0,0 +1,36 @@
+import os
+import signal
+import time
+
+import pytest
+
+import app.main
+from app.main import POOL_MIN_BYTES
+
+def large_snippet(marker: str):
+    # Big enough to be analyzed in the process pool rather than in-process
+    filler = "x = 1\n" * (POOL_MIN_BYTES // 6 + 1)
+    return f"def {marker}(a=[]):\n    pass\n" + filler
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_recovers_after_workers_are_killed(client):
+    response = client.post("/analyze", json={"code": large_snippet("first")})
+    assert response.json()["success"] is True
+
+    broken_pool = app.main.process_pool
+    workers = list(broken_pool._processes.values())
+    for worker in workers:
+        os.kill(worker.pid, signal.SIGKILL)
+    for worker in workers:
+        worker.join(timeout=5)
+    # Give the pool's management thread a moment to notice the dead workers
+    time.sleep(0.5)
+
+    response = client.post("/analyze", json={"code": large_snippet("second")})
+    assert response.status_code == 200
+    issues = response.json()["issues"]
+    assert [issue["type"] for issue in issues] == ["mutable_default_argument"]
+    assert app.main.process_pool is not broken_pool
+
+    response = client.post("/analyze_batch", json={"codes": [large_snippet("third")]})
+    assert response.status_code == 200
@@ -0,0 +1,32 @@
+from app.main import MAX_CODE_BYTES, MAX_REQUEST_BYTES
+
+TOO_LARGE = {"success": False, "message": "Request body too large"}
+
+def test_oversized_body_with_content_length_is_rejected(client):
+    body = b" " * (MAX_REQUEST_BYTES + 1)
+    response = client.post(
+        "/analyze_batch", content=body, headers={"content-type": "application/json"}
+    )
+    assert response.status_code == 413
+    assert response.json() == TOO_LARGE
+
+def test_oversized_chunked_body_is_rejected(client):
+    chunk = b" " * 65536
+
+    def chunks():
+        # Generator content is sent chunked, with no Content-Length header
+        for _ in range(MAX_REQUEST_BYTES // len(chunk) + 1):
+            yield chunk
+
+    response = client.post(
+        "/analyze_batch", content=chunks(), headers={"content-type": "application/json"}
+    )
+    assert response.status_code == 413
+    assert response.json() == TOO_LARGE
+
+def test_snippet_over_limit_gets_code_too_large(client):
+    response = client.post("/analyze", json={"code": "x" * (MAX_CODE_BYTES + 1)})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["success"] is False
+    assert [issue["type"] for issue in result["issues"]] == ["code_too_large"]